@@ -9,7 +9,7 @@ SECRET_KEY = os.environ.get(
     "SECRET_KEY", "django-insecure-x#*3)%8wm$$*7wi_ucjme5*$)k45)m31n8%r_e)#*+s9h(a5qd"
 )
 
-DEBUG = True
+DEBUG = os.environ.get("DJANGO_DEBUG", "True").lower() == "true"
 
 
 ALLOWED_HOSTS_STR = os.environ.get("DJANGO_ALLOWED_HOSTS", "").split(" ")
@@ -41,6 +41,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # Сжатие ответов (zstd/brotli/gzip) — должно стоять до изменяющих тело middleware
+    "testing.middleware.CompressionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -135,10 +137,9 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
 REST_FRAMEWORK = {
+    # JSON через orjson (с откатом на стандартный энкодер, если orjson не установлен)
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
-        # BrowsableAPIRenderer лучше отключать в production
-        "rest_framework.renderers.BrowsableAPIRenderer",
+        "testing.renderers.ORJSONRenderer",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
@@ -150,6 +151,17 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10
 }
 
+# BrowsableAPIRenderer отключен в production (DJANGO_DEBUG=False)
+if DEBUG:
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].append(
+        "rest_framework.renderers.BrowsableAPIRenderer"
+    )
+
+# Ответы меньше этого размера (в байтах) не сжимаются
+RESPONSE_COMPRESSION_MIN_SIZE = int(
+    os.environ.get("RESPONSE_COMPRESSION_MIN_SIZE", "1024")
+)
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
@@ -1,7 +1,35 @@
+from django import forms
 from django.contrib import admin
-from .models import News, User
+from .models import News, NewsStats, User
 
 
 
 admin.site.register(User)
-admin.site.register(News)
+
+
+class NewsAdminForm(forms.ModelForm):
+    """
+    Редактирует полный текст через News.body, чтобы сжатые статьи
+    не показывались с пустым content.
+    """
+
+    class Meta:
+        model = News
+        fields = ["title", "content", "is_published", "user"]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial["content"] = self.instance.body
+
+    def save(self, commit=True):
+        self.instance.body = self.cleaned_data["content"]
+        return super().save(commit=commit)
+
+
+@admin.register(News)
+class NewsAdmin(admin.ModelAdmin):
+    form = NewsAdminForm
+
+
+admin.site.register(NewsStats)
@@ -5,5 +5,9 @@ class TestingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "testing"
 
-    # def ready(self):
-    #     import testing.signals
+    def ready(self):
+        # Счетчики NewsStats обновляются сигналами на запись News
+        import testing.stats  # noqa: F401
+        # LSH-корзины новостей переписываются при смене сигнатуры
+        import testing.dedup  # noqa: F401
+        # import testing.signals
@@ -0,0 +1,235 @@
+import hashlib
+import random
+import re
+import zlib
+from array import array
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import News, NewsLSHBucket
+
+# Параметры сигнатуры: NUM_PERM = LSH_BANDS * LSH_ROWS
+NUM_PERM = 128
+LSH_BANDS = 16
+LSH_ROWS = 8
+SHINGLE_SIZE = 3
+# Текстам короче этого числа шинглов сигнатура не считается: пустые и очень
+# короткие тексты (например, релиз из одних картинок) почти всегда «совпадают»,
+# для них остается только проверка по заголовку
+MIN_SHINGLES = 10
+# Минимальная оценка сходства Жаккара, при которой статьи считаются дубликатами
+NEWS_DUPLICATE_THRESHOLD = getattr(settings, "NEWS_DUPLICATE_THRESHOLD", 0.8)
+# Сколько кандидатов с наибольшим числом совпавших полос сравнивается по сигнатуре
+LSH_TOP_CANDIDATES = 10
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Коэффициенты фиксированы (seed), чтобы сигнатуры из БД оставались сравнимыми:
+# первая пара — хеш шинглов, вторая — выбор ячейки при уплотнении
+_rng = random.Random(1)
+_HASH_A, _HASH_B = _rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(_MERSENNE_PRIME)
+_PROBE_A, _PROBE_B = _rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(_MERSENNE_PRIME)
+
+re_word = re.compile(r"\w+")
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """
+    Множество хешей словесных шинглов нормализованного текста.
+    """
+    words = re_word.findall(text.lower())
+    return {
+        zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    }
+
+
+def minhash(text):
+    """
+    MinHash-сигнатура текста: NUM_PERM 32-битных значений.
+    Для текстов короче MIN_SHINGLES шинглов возвращает None.
+
+    Одна перестановка (one permutation hashing): каждый шингл хешируется
+    один раз и попадает в одну из NUM_PERM ячеек, в ячейке остается
+    минимум. Пустые ячейки заполняются из непустых (densification) по
+    последовательности, которая зависит только от номера ячейки, поэтому
+    совпадения позиций по-прежнему оценивают сходство Жаккара.
+    Время — O(число шинглов) вместо O(NUM_PERM * число шинглов).
+    """
+    hashes = shingles(text)
+    if len(hashes) < MIN_SHINGLES:
+        return None
+    bins = [None] * NUM_PERM
+    for h in hashes:
+        value, index = divmod((_HASH_A * h + _HASH_B) % _MERSENNE_PRIME, NUM_PERM)
+        if bins[index] is None or value < bins[index]:
+            bins[index] = value
+    signature = array("I", bytes(4 * NUM_PERM))
+    for index in range(NUM_PERM):
+        source, attempt = index, 0
+        while bins[source] is None:
+            attempt += 1
+            source = (
+                (_PROBE_A * (attempt * NUM_PERM + index) + _PROBE_B)
+                % _MERSENNE_PRIME
+                % NUM_PERM
+            )
+        signature[index] = bins[source] & _MAX_HASH
+    return signature
+
+
+def signature_to_bytes(signature):
+    return signature.tobytes()
+
+
+def signature_from_bytes(data):
+    signature = array("I")
+    signature.frombytes(bytes(data))
+    return signature
+
+
+def similarity(sig_a, sig_b):
+    """
+    Оценка сходства Жаккара по двум сигнатурам.
+    """
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def band_keys(signature):
+    """
+    Ключи LSH-корзин: по одному 63-битному хешу на каждую полосу (band).
+    Помещается в BigIntegerField.
+    """
+    keys = []
+    for band in range(LSH_BANDS):
+        chunk = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes()
+        digest = hashlib.blake2b(chunk, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "big") >> 1)
+    return keys
+
+
+class MinHashLSH:
+    """
+    LSH-индекс в памяти. Используется для дедупликации внутри одной
+    пачки спарсенных статей, еще не сохраненных в БД.
+    """
+
+    def __init__(self):
+        self.buckets = [defaultdict(list) for _ in range(LSH_BANDS)]
+        self.signatures = {}
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def add_band_keys(self, key, keys):
+        for band, bucket_key in enumerate(keys):
+            self.buckets[band][bucket_key].append(key)
+
+    def insert(self, key, signature):
+        self.signatures[key] = signature
+        self.add_band_keys(key, band_keys(signature))
+
+    def candidates(self, keys):
+        found = set()
+        for band, bucket_key in enumerate(keys):
+            found.update(self.buckets[band].get(bucket_key, ()))
+        return found
+
+    def find_duplicate(self, signature, threshold=NEWS_DUPLICATE_THRESHOLD):
+        """
+        Ключ самого похожего ранее добавленного документа или None.
+        """
+        best, best_score = None, threshold
+        for key in self.candidates(band_keys(signature)):
+            stored = self.signatures.get(key)
+            if stored is None:
+                continue
+            score = similarity(signature, stored)
+            if score >= best_score:
+                best, best_score = key, score
+        return best
+
+
+def candidate_buckets(signature):
+    """
+    Строки NewsLSHBucket, совпавшие с сигнатурой хотя бы в одной полосе.
+    """
+    condition = Q()
+    for band, key in enumerate(band_keys(signature)):
+        condition |= Q(band=band, key=key)
+    return NewsLSHBucket.objects.filter(condition)
+
+
+def find_duplicate_news(signature, threshold=NEWS_DUPLICATE_THRESHOLD):
+    """
+    Ищет почти-дубликат среди сохраненных новостей через таблицу
+    NewsLSHBucket (индекс по band, key) и возвращает News или None.
+    Кандидаты ранжируются в SQL по числу совпавших полос, по сигнатуре
+    сравниваются только первые LSH_TOP_CANDIDATES: ожидаемое число полос
+    растет со сходством s как LSH_BANDS * s ** LSH_ROWS, поэтому дубликаты
+    оказываются в начале списка, а редкие случайные совпадения — в конце.
+    Найденная новость загружается целиком.
+    """
+    candidate_ids = list(
+        candidate_buckets(signature)
+        .values("news_id")
+        .annotate(n=Count("id"))
+        .order_by("-n")
+        .values_list("news_id", flat=True)[:LSH_TOP_CANDIDATES]
+    )
+    if not candidate_ids:
+        return None
+
+    best, best_score = None, threshold
+    for news in News.objects.filter(id__in=candidate_ids).only("id", "minhash"):
+        if not news.minhash:
+            continue
+        score = similarity(signature, signature_from_bytes(news.minhash))
+        if score >= best_score:
+            best, best_score = news, score
+    if best is None:
+        return None
+    return News.objects.get(pk=best.pk)
+
+
+def index_news(news_list):
+    """
+    Сохраняет LSH-корзины для уже созданных новостей с заполненным minhash.
+    """
+    buckets = [
+        NewsLSHBucket(news_id=news.id, band=band, key=key)
+        for news in news_list
+        if news.minhash
+        for band, key in enumerate(band_keys(signature_from_bytes(news.minhash)))
+    ]
+    NewsLSHBucket.objects.bulk_create(buckets, batch_size=1000)
+
+
+def merge_duplicate(original, content):
+    """
+    Сливает переизданную статью с уже сохраненной: если текст изменился,
+    обновляет оригинал вместо вставки новой строки. Сигнатура и LSH-корзины
+    пересчитываются в save() и update_lsh_buckets.
+    Возвращает True, если оригинал был обновлен.
+    """
+    if original.body == content:
+        return False
+    original.body = content
+    original.save()
+    return True
+
+
+@receiver(post_save, sender=News)
+def update_lsh_buckets(sender, instance, created, raw=False, **kwargs):
+    # prepare_content отмечает, что сигнатура пересчитана
+    if raw or not getattr(instance, "_minhash_changed", False):
+        return
+    instance._minhash_changed = False
+    if not created:
+        instance.lsh_buckets.all().delete()
+    index_news([instance])
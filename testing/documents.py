@@ -14,7 +14,7 @@ class NewsDocument(Document):
             "suggest": fields.CompletionField(),  # Для автодополнения (опционально)
         },
     )
-    content = fields.TextField(attr="content")
+    content = fields.TextField(attr="body")
     created_at = fields.DateField(attr="time_create")
     updated_at = fields.DateField(attr="time_update")
     user = fields.IntegerField(attr='user.id')
@@ -0,0 +1,151 @@
+import random
+import time
+from array import array
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from testing.dedup import (
+    LSH_TOP_CANDIDATES,
+    NUM_PERM,
+    candidate_buckets,
+    find_duplicate_news,
+    index_news,
+    minhash,
+    signature_to_bytes,
+)
+from testing.models import News
+
+VOCABULARY = [f"слово{i}" for i in range(5000)]
+
+
+def make_article(rng, words=300):
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def edit_article(rng, text, changes=5):
+    words = text.split()
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = "правка"
+    return " ".join(words)
+
+
+def random_signature(rng):
+    """
+    Сигнатура статьи, не похожей ни на одну другую.
+    """
+    return array("I", rng.randbytes(4 * NUM_PERM))
+
+
+def similar_signature(rng, base, similarity):
+    """
+    Сигнатура документа со сходством Жаккара similarity к base: каждая
+    позиция MinHash совпадает с вероятностью, равной сходству. Так корпус
+    из миллиона похожих статей строится без подсчета миллиона сигнатур.
+    """
+    return array(
+        "I",
+        (
+            value if rng.random() < similarity else rng.getrandbits(32)
+            for value in base
+        ),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет find_duplicate_news на таблице NewsLSHBucket при росте "
+        "корпуса (по умолчанию от 10 тыс. до 1 млн статей). Корпус: исходные "
+        "статьи с настоящими сигнатурами, затем в основном независимые статьи "
+        "и доля (--duplicate-share) переизданий ранее добавленных. Запросы — "
+        "отредактированные исходные статьи. Все данные откатываются в конце."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+        )
+        parser.add_argument("--bases", type=int, default=2000)
+        parser.add_argument("--duplicate-share", type=float, default=0.1)
+        # Из скольких ранних статей выбираются переиздания: все сигнатуры
+        # миллионного корпуса в памяти не держатся
+        parser.add_argument("--pool", type=int, default=20_000)
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+
+        self.stdout.write(f"Сигнатуры {options['bases']} исходных статей...")
+        texts = [make_article(rng) for _ in range(options["bases"])]
+        bases = [minhash(text) for text in texts]
+
+        # Запросы — слегка отредактированные копии исходных статей
+        queries = [
+            minhash(edit_article(rng, rng.choice(texts)))
+            for _ in range(options["queries"])
+        ]
+
+        with transaction.atomic():
+            user, _ = get_user_model().objects.get_or_create(
+                username="bench_news_dedup",
+                defaults={"email": "bench_news_dedup@example.com"},
+            )
+            pool = list(bases)
+            filled = 0
+            for size in sorted(options["sizes"]):
+                while filled < size:
+                    count = min(options["batch_size"], size - filled)
+                    self.insert(rng, user, pool, filled, count, options)
+                    filled += count
+                self.measure(size, queries)
+            transaction.set_rollback(True)
+
+    def insert(self, rng, user, pool, start, count, options):
+        news_list = []
+        for i in range(start, start + count):
+            if i < options["bases"]:
+                signature = pool[i]
+            elif rng.random() < options["duplicate_share"]:
+                signature = similar_signature(
+                    rng, rng.choice(pool), rng.uniform(0.2, 0.9)
+                )
+            else:
+                signature = random_signature(rng)
+            if i >= options["bases"] and len(pool) < options["pool"]:
+                pool.append(signature)
+            news_list.append(
+                News(
+                    title=f"bench {i}",
+                    user=user,
+                    minhash=signature_to_bytes(signature),
+                )
+            )
+        # bulk_create не вызывает save(): сигнатуры уже посчитаны
+        News.objects.bulk_create(news_list, batch_size=1000)
+        index_news(news_list)
+
+    def measure(self, size, queries):
+        # Сколько строк корзин группирует SQL и сколько новостей за ними стоит;
+        # по сигнатуре сравниваются не больше LSH_TOP_CANDIDATES из них
+        bucket_rows = candidates = 0
+        for signature in queries:
+            buckets = candidate_buckets(signature)
+            bucket_rows += buckets.count()
+            candidates += buckets.values("news_id").distinct().count()
+
+        found = 0
+        start = time.perf_counter()
+        for signature in queries:
+            if find_duplicate_news(signature) is not None:
+                found += 1
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"corpus={size:9} lookup={elapsed / len(queries) * 1000:8.3f}ms "
+            f"bucket_rows={bucket_rows / len(queries):8.1f} "
+            f"candidates={candidates / len(queries):8.1f} "
+            f"compared<={LSH_TOP_CANDIDATES} "
+            f"recall={found}/{len(queries)}"
+        )
@@ -0,0 +1,106 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+
+from testing.models import News
+from testing.serializers import NewsListSerializer, NewsSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет размер таблицы новостей и размер/время ответа списка: "
+        "полный текст (как было) против анонса (как сейчас)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--storage-only",
+            action="store_true",
+            help="Только размер таблицы — работает и до миграции 0003.",
+        )
+
+    def handle(self, *args, **options):
+        page_size = options["page_size"]
+        repeat = options["repeat"]
+
+        self.report_storage()
+        if options["storage_only"]:
+            return
+
+        modes = {
+            # До: полный текст каждой новости в списке
+            "full": (
+                lambda: News.objects.select_related("user"),
+                NewsSerializer,
+            ),
+            # После: только анонс, полный текст не читается из БД
+            "excerpt": (
+                # Тот же queryset, что у NewsViewSet.list
+                News.objects.for_list,
+                NewsListSerializer,
+            ),
+        }
+        for name, (get_queryset, serializer_class) in modes.items():
+            timings = []
+            size = 0
+            for _ in range(repeat):
+                start = time.perf_counter()
+                page = list(get_queryset().order_by("-id")[:page_size])
+                data = serializer_class(page, many=True).data
+                size = len(JSONRenderer().render(data))
+                timings.append(time.perf_counter() - start)
+            self.stdout.write(
+                f"{name:8} items={len(page):5} bytes={size:10} "
+                f"best={min(timings) * 1000:8.2f}ms "
+                f"avg={sum(timings) / len(timings) * 1000:8.2f}ms"
+            )
+
+    def report_storage(self):
+        # Команда видит только текущее состояние таблицы: чтобы сравнить
+        # размер «до/после», ее нужно запустить до и после миграции 0003
+        self.stdout.write(
+            "Размер таблицы — текущий. Для сравнения запустите "
+            "bench_news_list --storage-only до migrate testing 0003 и после."
+        )
+        table = News._meta.db_table
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_total_relation_size(%s), "
+                    "COALESCE(SUM(octet_length(content)), 0), "
+                    "COUNT(*) "
+                    f"FROM {connection.ops.quote_name(table)}",
+                    [table],
+                )
+                total, plain, rows = cursor.fetchone()
+            self.stdout.write(
+                f"table={total} bytes, rows={rows}, content={plain} bytes"
+            )
+            if self.has_column(table, "content_compressed"):
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT COALESCE(SUM(octet_length(content_compressed)), 0), "
+                        "COUNT(content_compressed) "
+                        f"FROM {connection.ops.quote_name(table)}"
+                    )
+                    compressed, compressed_rows = cursor.fetchone()
+                self.stdout.write(
+                    f"compressed={compressed} bytes in {compressed_rows} rows"
+                )
+        else:
+            self.stdout.write(
+                f"Размер таблицы на {connection.vendor} не замеряется: "
+                "pg_total_relation_size есть только в PostgreSQL."
+            )
+
+    @staticmethod
+    def has_column(table, column):
+        with connection.cursor() as cursor:
+            description = connection.introspection.get_table_description(
+                cursor, table
+            )
+        return any(col.name == column for col in description)
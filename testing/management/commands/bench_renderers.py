@@ -0,0 +1,109 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from testing.middleware import COMPRESSORS, CompressionMiddleware
+from testing.models import News
+from testing.renderers import ORJSONRenderer
+from testing.serializers import NewsListSerializer
+
+ALPHABET = "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
+
+
+def make_vocabulary(rng, size=20000):
+    return [
+        "".join(rng.choice(ALPHABET) for _ in range(rng.randint(3, 12)))
+        for _ in range(size)
+    ]
+
+
+def make_text(rng, vocabulary, words):
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет время рендеринга и размер ответа на проводе для страниц "
+        "списка новостей: NewsListSerializer по строкам БД, сжатие — через "
+        "CompressionMiddleware (порог и дополнение gzip учитываются). Если "
+        "новостей в БД не хватает, недостающие генерируются и откатываются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.fill(max(options["sizes"]))
+            for size in options["sizes"]:
+                self.measure(size, options["repeat"])
+            transaction.set_rollback(True)
+
+    def fill(self, count):
+        missing = count - News.objects.count()
+        if missing <= 0:
+            return
+        self.stdout.write(f"Генерируется {missing} новостей (будут откачены)")
+        rng = random.Random(42)
+        vocabulary = make_vocabulary(rng)
+        user, _ = get_user_model().objects.get_or_create(
+            username="bench_renderers",
+            defaults={"email": "bench_renderers@example.com"},
+        )
+        news_list = []
+        for _ in range(missing):
+            news = News(
+                title=make_text(rng, vocabulary, rng.randint(5, 12)),
+                content=make_text(rng, vocabulary, rng.randint(200, 800)),
+                user=user,
+            )
+            news.prepare_content()
+            news_list.append(news)
+        News.objects.bulk_create(news_list, batch_size=1000)
+
+    def measure(self, size, repeat):
+        page = list(News.objects.for_list().order_by("-id")[:size])
+        data = {
+            "count": size,
+            "next": None,
+            "previous": None,
+            "results": NewsListSerializer(page, many=True).data,
+        }
+
+        for name, renderer in (("json", JSONRenderer()), ("orjson", ORJSONRenderer())):
+            best = min(self.timeit(renderer.render, data) for _ in range(repeat))
+            self.stdout.write(
+                f"items={size:5} renderer={name:7} render={best * 1000:8.3f}ms"
+            )
+
+        body = ORJSONRenderer().render(data)
+        self.stdout.write(f"items={size:5} identity bytes={len(body):9}")
+        middleware = CompressionMiddleware(
+            lambda request: HttpResponse(body, content_type="application/json")
+        )
+        for encoding in COMPRESSORS:
+            request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=encoding)
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                response = middleware(request)
+                timings.append(time.perf_counter() - start)
+            self.stdout.write(
+                f"items={size:5} {encoding:8} "
+                f"bytes={len(response.content):9} "
+                f"encoding={response.get('Content-Encoding', 'identity'):8} "
+                f"middleware={min(timings) * 1000:8.3f}ms"
+            )
+
+    @staticmethod
+    def timeit(func, *args):
+        start = time.perf_counter()
+        func(*args)
+        return time.perf_counter() - start
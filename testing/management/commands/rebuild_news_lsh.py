@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from testing.dedup import index_news, minhash, signature_to_bytes
+from testing.models import News, NewsLSHBucket
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает MinHash-сигнатуры всех новостей и заново строит "
+        "LSH-индекс для поиска почти-дубликатов."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        total = 0
+        with transaction.atomic():
+            NewsLSHBucket.objects.all().delete()
+            batch = []
+            queryset = News.objects.only("id", "content", "content_compressed")
+            for news in queryset.iterator(chunk_size=batch_size):
+                signature = minhash(news.body)
+                news.minhash = signature_to_bytes(signature) if signature else None
+                batch.append(news)
+                if len(batch) >= batch_size:
+                    total += self.flush(batch)
+                    batch = []
+            if batch:
+                total += self.flush(batch)
+        self.stdout.write(f"Проиндексировано новостей: {total}")
+
+    @staticmethod
+    def flush(batch):
+        News.objects.bulk_update(batch, ["minhash"])
+        index_news(batch)
+        return len(batch)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from testing.stats import reconcile_news_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Сверяет счетчики NewsStats с таблицей News и исправляет расхождения. "
+        "Предназначена для периодического запуска (cron)."
+    )
+
+    def handle(self, *args, **options):
+        fixed = reconcile_news_stats()
+        self.stdout.write(f"Исправлено записей статистики: {fixed}")
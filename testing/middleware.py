@@ -0,0 +1,133 @@
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Ответы меньше этого размера (в байтах) не сжимаются — выигрыш меньше накладных расходов.
+# Переопределяется настройкой RESPONSE_COMPRESSION_MIN_SIZE
+RESPONSE_COMPRESSION_MIN_SIZE = 1024
+
+
+def _gzip(data):
+    # Как в GZipMiddleware: случайная длина заголовка gzip против BREACH
+    return compress_string(data, max_random_bytes=100)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=4)
+
+
+def _zstd(data):
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+# Кодировки в порядке предпочтения сервера; недоступные библиотеки пропускаются
+COMPRESSORS = {
+    name: func
+    for name, func, available in (
+        ("zstd", _zstd, zstandard is not None),
+        ("br", _brotli, brotli is not None),
+        ("gzip", _gzip, True),
+    )
+    if available
+}
+
+
+def parse_accept_encoding(header):
+    """
+    Возвращает словарь {кодировка: q} из заголовка Accept-Encoding.
+    Параметр q ищется среди всех параметров кодировки.
+    """
+    accepted = {}
+    for part in header.split(","):
+        name, *params = (item.strip() for item in part.split(";"))
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0
+        accepted[name.lower()] = q
+    return accepted
+
+
+def choose_encoding(header, encodings=COMPRESSORS):
+    """
+    Выбирает кодировку с максимальным q среди encodings (по умолчанию все
+    поддерживаемые сервером). При равных q побеждает та, что раньше в списке.
+    """
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for name in encodings:
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Сжимает ответ в zstd, brotli или gzip в зависимости от Accept-Encoding.
+    Аналог django.middleware.gzip.GZipMiddleware с выбором кодировки.
+
+    Защита от BREACH (случайное дополнение) есть только у gzip: у brotli
+    и zstd нет заголовка, куда его можно добавить. Поэтому brotli и zstd
+    применяются только к JSON-ответам API (аутентификация JWT-заголовком,
+    секретов в теле нет), а HTML — админка, формы входа DRF с CSRF-токеном —
+    сжимается только gzip с дополнением.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        # Потоковые ответы не сжимаем, чтобы не буферизовать их целиком
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        min_size = getattr(
+            settings, "RESPONSE_COMPRESSION_MIN_SIZE", RESPONSE_COMPRESSION_MIN_SIZE
+        )
+        if len(response.content) < min_size:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        if response.get("Content-Type", "").startswith("application/json"):
+            encodings = COMPRESSORS
+        else:
+            encodings = ("gzip",)
+        encoding = choose_encoding(
+            request.META.get("HTTP_ACCEPT_ENCODING", ""), encodings
+        )
+        if encoding is None:
+            return response
+
+        compressed = COMPRESSORS[encoding](response.content)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(compressed))
+        response.headers["Content-Encoding"] = encoding
+
+        # Сжатое тело отличается от исходного побайтно — ETag становится слабым
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+
+        return response
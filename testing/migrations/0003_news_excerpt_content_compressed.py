@@ -0,0 +1,63 @@
+# Generated by Django 5.2.2 on 2026-10-19 14:28
+
+import zlib
+
+from django.db import migrations, models
+
+# Копии из testing.models на момент миграции, чтобы история миграций
+# не зависела от текущего кода модели
+NEWS_EXCERPT_LENGTH = 300
+NEWS_CONTENT_COMPRESS_THRESHOLD = 16 * 1024
+
+
+def make_excerpt(text, length=NEWS_EXCERPT_LENGTH):
+    text = " ".join(text.split())
+    if len(text) <= length:
+        return text
+    cut = text[:length].rsplit(" ", 1)[0] or text[:length]
+    return cut.rstrip(" .,;:") + "…"
+
+
+def fill_excerpt_and_compress(apps, schema_editor):
+    News = apps.get_model("testing", "News")
+    batch = []
+    for news in News.objects.only("id", "content").iterator(chunk_size=500):
+        news.excerpt = make_excerpt(news.content)
+        raw = news.content.encode("utf-8")
+        if len(raw) >= NEWS_CONTENT_COMPRESS_THRESHOLD:
+            news.content_compressed = zlib.compress(raw, 6)
+            news.content = ""
+        batch.append(news)
+        if len(batch) >= 500:
+            News.objects.bulk_update(batch, ["excerpt", "content", "content_compressed"])
+            batch = []
+    if batch:
+        News.objects.bulk_update(batch, ["excerpt", "content", "content_compressed"])
+
+
+def decompress_content(apps, schema_editor):
+    News = apps.get_model("testing", "News")
+    for news in News.objects.filter(content_compressed__isnull=False).iterator():
+        news.content = zlib.decompress(bytes(news.content_compressed)).decode("utf-8")
+        news.save(update_fields=["content"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testing', '0002_alter_news_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='content_compressed',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='excerpt',
+            field=models.CharField(blank=True, max_length=301),
+        ),
+        migrations.RunPython(fill_excerpt_and_compress, decompress_content),
+    ]
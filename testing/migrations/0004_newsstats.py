@@ -0,0 +1,39 @@
+# Generated by Django 5.2.2 on 2026-10-19 14:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def fill_news_stats(apps, schema_editor):
+    News = apps.get_model("testing", "News")
+    NewsStats = apps.get_model("testing", "NewsStats")
+    rows = News.objects.values("user_id").annotate(
+        total=Count("id"),
+        published=Count("id", filter=Q(is_published=True)),
+        last_update=Max("time_update"),
+    ).order_by()
+    NewsStats.objects.bulk_create(
+        [NewsStats(**row) for row in rows], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testing', '0003_news_excerpt_content_compressed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='news_stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('published', models.PositiveIntegerField(default=0)),
+                ('last_update', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(fill_news_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,122 @@
+# Generated by Django 5.2.2 on 2026-10-19 14:31
+
+import hashlib
+import random
+import re
+import zlib
+from array import array
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Копии из testing.dedup на момент миграции, чтобы история миграций
+# не зависела от текущего кода. Параметры должны совпадать, иначе
+# сигнатуры из миграции будут несравнимы с новыми
+NUM_PERM = 128
+LSH_BANDS = 16
+LSH_ROWS = 8
+SHINGLE_SIZE = 3
+MIN_SHINGLES = 10
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(1)
+_HASH_A, _HASH_B = _rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(_MERSENNE_PRIME)
+_PROBE_A, _PROBE_B = _rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(_MERSENNE_PRIME)
+re_word = re.compile(r"\w+")
+
+
+def minhash(text):
+    words = re_word.findall(text.lower())
+    hashes = {
+        zlib.crc32(" ".join(words[i:i + SHINGLE_SIZE]).encode("utf-8"))
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+    if len(hashes) < MIN_SHINGLES:
+        return None
+    bins = [None] * NUM_PERM
+    for h in hashes:
+        value, index = divmod((_HASH_A * h + _HASH_B) % _MERSENNE_PRIME, NUM_PERM)
+        if bins[index] is None or value < bins[index]:
+            bins[index] = value
+    signature = array("I", bytes(4 * NUM_PERM))
+    for index in range(NUM_PERM):
+        source, attempt = index, 0
+        while bins[source] is None:
+            attempt += 1
+            source = (
+                (_PROBE_A * (attempt * NUM_PERM + index) + _PROBE_B)
+                % _MERSENNE_PRIME
+                % NUM_PERM
+            )
+        signature[index] = bins[source] & _MAX_HASH
+    return signature
+
+
+def band_keys(signature):
+    keys = []
+    for band in range(LSH_BANDS):
+        chunk = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes()
+        digest = hashlib.blake2b(chunk, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "big") >> 1)
+    return keys
+
+
+def fill_minhash(apps, schema_editor):
+    News = apps.get_model("testing", "News")
+    NewsLSHBucket = apps.get_model("testing", "NewsLSHBucket")
+    batch, buckets = [], []
+
+    def flush():
+        News.objects.bulk_update(batch, ["minhash"])
+        NewsLSHBucket.objects.bulk_create(buckets, batch_size=1000)
+        batch.clear()
+        buckets.clear()
+
+    queryset = News.objects.only("id", "content", "content_compressed")
+    for news in queryset.iterator(chunk_size=500):
+        if news.content_compressed:
+            text = zlib.decompress(bytes(news.content_compressed)).decode("utf-8")
+        else:
+            text = news.content
+        signature = minhash(text)
+        if signature is None:
+            continue
+        news.minhash = signature.tobytes()
+        batch.append(news)
+        buckets.extend(
+            NewsLSHBucket(news_id=news.id, band=band, key=key)
+            for band, key in enumerate(band_keys(signature))
+        )
+        if len(batch) >= 500:
+            flush()
+    if batch:
+        flush()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testing', '0004_newsstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='minhash',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='NewsLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('key', models.BigIntegerField()),
+                ('news', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='testing.news')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'key'], name='testing_new_band_b6229a_idx')],
+            },
+        ),
+        migrations.RunPython(fill_minhash, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,32 @@
+import zlib
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
+# Длина анонса, который отдается в списке новостей вместо полного текста.
+# Не настройка: от нее зависит max_length поля News.excerpt
+NEWS_EXCERPT_LENGTH = 300
+# Тексты длиннее этого порога (в байтах) хранятся в сжатом виде. Порог
+# намеренно высокий: PostgreSQL и так сжимает (TOAST) значения от ~2 КБ, а
+# сжатый текст не виден поиску SearchFilter (LIKE по content) — у таких
+# статей SQL-поиск идет только по title и excerpt, полнотекстовый — через
+# Elasticsearch (NewsDocument индексирует body)
+NEWS_CONTENT_COMPRESS_THRESHOLD = getattr(
+    settings, "NEWS_CONTENT_COMPRESS_THRESHOLD", 1024 * 1024
+)
+
+
+def make_excerpt(text, length=NEWS_EXCERPT_LENGTH):
+    """
+    Возвращает анонс: начало текста, обрезанное по границе слова.
+    """
+    text = " ".join(text.split())
+    if len(text) <= length:
+        return text
+    cut = text[:length].rsplit(" ", 1)[0] or text[:length]
+    return cut.rstrip(" .,;:") + "…"
+
 
 class User(AbstractUser):
     username = models.CharField("Логин", max_length=50, unique=True)
@@ -31,9 +57,27 @@ class User(AbstractUser):
         return self.username
 
 
+class NewsQuerySet(models.QuerySet):
+    def for_list(self):
+        """
+        Queryset для списка новостей: без полного текста и сигнатуры,
+        их подгружает только detail.
+        """
+        return self.select_related("user").defer(
+            "content", "content_compressed", "minhash"
+        )
+
+
 class News(models.Model):
     title = models.CharField(max_length=255)
     content = models.TextField(blank=True)
+    # Анонс для списка новостей (NEWS_EXCERPT_LENGTH символов и многоточие),
+    # пересчитывается при сохранении
+    excerpt = models.CharField(max_length=301, blank=True)
+    # Сжатый (zlib) полный текст для очень больших статей, content при этом пустой
+    content_compressed = models.BinaryField(null=True, blank=True, editable=False)
+    # MinHash-сигнатура текста для поиска почти-дубликатов (см. testing/dedup.py)
+    minhash = models.BinaryField(null=True, blank=True, editable=False)
     time_create = models.DateTimeField(auto_now_add=True)
     time_update = models.DateTimeField(auto_now=True)
     is_published = models.BooleanField(default=True)
@@ -41,5 +85,117 @@ class News(models.Model):
         "User", verbose_name="Пользователь", on_delete=models.CASCADE
     )
 
+    objects = NewsQuerySet.as_manager()
+
     def __str__(self):
         return self.title
+
+    @property
+    def body(self):
+        """
+        Полный текст новости, независимо от того, сжат он или нет.
+        """
+        if self.content_compressed:
+            return zlib.decompress(bytes(self.content_compressed)).decode("utf-8")
+        return self.content
+
+    @body.setter
+    def body(self, value):
+        self.content = value
+        self.content_compressed = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Текст на момент загрузки — чтобы пересчитывать сигнатуру только при его изменении
+        if "content" in field_names and "content_compressed" in field_names:
+            instance._loaded_content = instance._stored_content()
+        return instance
+
+    def _stored_content(self):
+        compressed = self.content_compressed
+        return self.content, bytes(compressed) if compressed else None
+
+    def prepare_content(self):
+        """
+        Пересчитывает анонс, сжимает слишком большой текст и обновляет
+        MinHash-сигнатуру, если текст изменился.
+        Вызывается в save(), а при bulk_create — вручную.
+        Непустой content считается новым текстом, даже если у строки
+        уже есть сжатая версия.
+        Если content отложен (for_list, .only()), текст не загружен и не
+        менялся — анонс, сжатие и сигнатура не трогаются.
+        """
+        if "content" in self.get_deferred_fields():
+            return
+        text = self.content or self.body
+        self.excerpt = make_excerpt(text)
+        raw = text.encode("utf-8")
+        if len(raw) >= NEWS_CONTENT_COMPRESS_THRESHOLD:
+            self.content = ""
+            self.content_compressed = zlib.compress(raw, 6)
+        else:
+            self.content = text
+            self.content_compressed = None
+
+        stored = self._stored_content()
+        if self._state.adding:
+            # Сигнатуру могли посчитать заранее (CreatingNews)
+            changed = self.minhash is None
+        else:
+            changed = getattr(self, "_loaded_content", None) != stored
+        if changed:
+            from .dedup import minhash, signature_to_bytes
+
+            signature = minhash(text)
+            self.minhash = signature_to_bytes(signature) if signature else None
+            self._minhash_changed = True
+        self._loaded_content = stored
+
+    def save(self, *args, **kwargs):
+        self.prepare_content()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "content" in update_fields:
+            kwargs["update_fields"] = {
+                *update_fields, "excerpt", "content_compressed", "minhash"
+            }
+        super().save(*args, **kwargs)
+
+
+class NewsStats(models.Model):
+    """
+    Денормализованные счетчики новостей пользователя.
+    Обновляются при записи News (см. testing/stats.py) и сверяются
+    командой reconcile_news_stats.
+    """
+    user = models.OneToOneField(
+        "User",
+        verbose_name="Пользователь",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="news_stats",
+    )
+    total = models.PositiveIntegerField(default=0)
+    published = models.PositiveIntegerField(default=0)
+    last_update = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.total}"
+
+
+class NewsLSHBucket(models.Model):
+    """
+    LSH-корзина MinHash-сигнатуры новости: одна строка на полосу (band).
+    Поиск кандидатов в дубликаты идет по индексу (band, key).
+    """
+    news = models.ForeignKey(
+        "News", on_delete=models.CASCADE, related_name="lsh_buckets"
+    )
+    band = models.PositiveSmallIntegerField()
+    key = models.BigIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=["band", "key"])]
+
+    def __str__(self):
+        return f"{self.news_id}: {self.band}/{self.key}"
@@ -108,25 +108,61 @@ def CreatingNews():
 
     from django.db import transaction
     from .models import News
+    from .stats import refresh_user_stats
+    from .dedup import (
+        MinHashLSH,
+        find_duplicate_news,
+        index_news,
+        merge_duplicate,
+        minhash,
+        signature_to_bytes,
+    )
     from django.contrib.auth import get_user_model
 
     existing_titles = set(News.objects.values_list("title", flat=True))
 
     User = get_user_model()
     author_user = User.objects.get(username='admin')
-    for article in parsed_articles:
-        title = article["title"]
-        content = article["content"]
-        if title not in existing_titles:
-            NewsForDB.append(
-                News(
-                    title=title, 
-                    content=content,
-                    user=author_user
-                    )
+    # Индекс статей текущей пачки, чтобы не вставить дубликаты друг друга
+    batch_index = MinHashLSH()
+    merged = 0
+    with transaction.atomic():
+        for article in parsed_articles:
+            title = article["title"]
+            content = article["content"]
+            if title in existing_titles:
+                continue
+
+            # Переизданные или слегка отредактированные релизы с другим заголовком.
+            # Для слишком коротких текстов сигнатуры нет — остается проверка по заголовку
+            signature = minhash(content)
+            if signature is not None:
+                if batch_index.find_duplicate(signature) is not None:
+                    continue
+                original = find_duplicate_news(signature)
+                if original is not None:
+                    merged += merge_duplicate(original, content)
+                    continue
+
+            news = News(
+                title=title, 
+                content=content,
+                user=author_user,
+                minhash=signature_to_bytes(signature) if signature else None,
                 )
-    if NewsForDB:
-        with transaction.atomic():
+            # bulk_create не вызывает save(), поэтому анонс и сжатие считаем здесь
+            news.prepare_content()
+            if signature is not None:
+                batch_index.insert(len(NewsForDB), signature)
+            existing_titles.add(title)
+            NewsForDB.append(news)
+
+        if NewsForDB:
             News.objects.bulk_create(NewsForDB, batch_size=50)
-    else:
-        print("Нет новых статей для добавления.")
\ No newline at end of file
+            index_news(NewsForDB)
+            # bulk_create не отправляет post_save — обновляем счетчики вручную
+            refresh_user_stats(author_user.id)
+        else:
+            print("Нет новых статей для добавления.")
+    if merged:
+        print(f"Обновлено почти-дубликатов: {merged}")
@@ -7,7 +7,9 @@ User = get_user_model()
 class NewsSerializer(serializers.Serializer):
     id = serializers.IntegerField(read_only=True)
     title = serializers.CharField(max_length=50)
-    content = serializers.CharField()
+    # Полный текст хранится либо в content, либо сжатым — читаем через body
+    content = serializers.CharField(source="body")
+    excerpt = serializers.CharField(read_only=True)
     time_create = serializers.DateTimeField(read_only=True)
     time_update = serializers.DateTimeField(read_only=True)
     is_published = serializers.BooleanField(default=True)
@@ -24,10 +26,31 @@ class NewsSerializer(serializers.Serializer):
 
     def update(self, instance, validated_data):
         instance.title = validated_data.get("title", instance.title)
-        instance.content = validated_data.get("content", instance.content)
+        if "body" in validated_data:
+            instance.body = validated_data["body"]
         instance.time_update = validated_data.get("time_update", instance.time_update)
         instance.is_published = validated_data.get(
             "is_published", instance.is_published
         )
         instance.save()
         return instance
+
+
+class NewsListSerializer(serializers.Serializer):
+    """
+    Облегченный сериализатор для списка: вместо полного текста отдает анонс.
+    """
+    id = serializers.IntegerField(read_only=True)
+    title = serializers.CharField(read_only=True)
+    excerpt = serializers.CharField(read_only=True)
+    time_create = serializers.DateTimeField(read_only=True)
+    time_update = serializers.DateTimeField(read_only=True)
+    is_published = serializers.BooleanField(read_only=True)
+    user_username = serializers.ReadOnlyField(source="user.username")
+
+
+class NewsStatsSerializer(serializers.Serializer):
+    user = serializers.IntegerField(source="user_id", read_only=True)
+    total = serializers.IntegerField(read_only=True)
+    published = serializers.IntegerField(read_only=True)
+    last_update = serializers.DateTimeField(read_only=True)
@@ -0,0 +1,152 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Max, OuterRef, Q, Subquery, Sum, When
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import News, NewsStats
+
+EMPTY_STATS = {"total": 0, "published": 0, "last_update": None}
+
+
+def compute_user_stats(user_id):
+    return News.objects.filter(user_id=user_id).aggregate(
+        total=Count("id"),
+        published=Count("id", filter=Q(is_published=True)),
+        last_update=Max("time_update"),
+    )
+
+
+def refresh_user_stats(user_id):
+    """
+    Пересчитывает счетчики пользователя по таблице News.
+    """
+    stats = compute_user_stats(user_id)
+    try:
+        with transaction.atomic():
+            obj, _ = NewsStats.objects.update_or_create(
+                user_id=user_id, defaults=stats
+            )
+    except IntegrityError:
+        # Строку параллельно создал другой запрос — просто обновляем ее
+        NewsStats.objects.filter(user_id=user_id).update(**stats)
+        obj = NewsStats.objects.get(user_id=user_id)
+    return obj
+
+
+def reconcile_news_stats():
+    """
+    Сверяет всю таблицу NewsStats с News и исправляет расхождения.
+    Возвращает количество исправленных пользователей.
+    """
+    actual = {
+        row.pop("user_id"): row
+        for row in News.objects.values("user_id").annotate(
+            total=Count("id"),
+            published=Count("id", filter=Q(is_published=True)),
+            last_update=Max("time_update"),
+        ).order_by()
+    }
+    stored = {
+        row.pop("user_id"): row
+        for row in NewsStats.objects.values(
+            "user_id", "total", "published", "last_update"
+        )
+    }
+
+    fixed = 0
+    # Пользователи, у которых новостей больше нет, остаются с нулевыми счетчиками
+    stale = [
+        user_id
+        for user_id, stats in stored.items()
+        if user_id not in actual and stats != EMPTY_STATS
+    ]
+    if stale:
+        NewsStats.objects.filter(user_id__in=stale).update(**EMPTY_STATS)
+        fixed += len(stale)
+    for user_id, stats in actual.items():
+        if stored.get(user_id) != stats:
+            NewsStats.objects.update_or_create(user_id=user_id, defaults=stats)
+            fixed += 1
+    return fixed
+
+
+def total_news_count():
+    """
+    Общее количество новостей по счетчикам, без COUNT(*) по News.
+    """
+    return NewsStats.objects.aggregate(total=Sum("total"))["total"] or 0
+
+
+@receiver(post_init, sender=News)
+def remember_user(sender, instance, **kwargs):
+    # Владелец и статус на момент загрузки — чтобы при сохранении обновить
+    # счетчики дельтой. Через __dict__, чтобы не подгружать отложенные поля
+    instance._stats_user_id = instance.__dict__.get("user_id")
+    instance._stats_is_published = instance.__dict__.get("is_published")
+
+
+@receiver(post_save, sender=News)
+def update_stats_on_save(
+    sender, instance, created, raw=False, update_fields=None, **kwargs
+):
+    if raw:
+        return
+    previous_user_id = instance._stats_user_id
+    previous_published = instance._stats_is_published
+
+    if created:
+        # Новая запись — достаточно инкремента без пересчета
+        updated = NewsStats.objects.filter(user_id=instance.user_id).update(
+            total=F("total") + 1,
+            published=F("published") + int(instance.is_published),
+            last_update=instance.time_update,
+        )
+    elif previous_user_id is not None and previous_user_id != instance.user_id:
+        # Смена владельца — пересчитываем обоих
+        refresh_user_stats(previous_user_id)
+        updated = False
+    else:
+        published_saved = update_fields is None or "is_published" in update_fields
+        if published_saved and previous_published is None:
+            # Статус до сохранения неизвестен — пересчитываем
+            updated = False
+        else:
+            changes = {}
+            if published_saved and previous_published != instance.is_published:
+                changes["published"] = F("published") + (
+                    int(instance.is_published) - int(previous_published)
+                )
+            # auto_now меняет time_update, только если поле сохранялось
+            if update_fields is None or "time_update" in update_fields:
+                changes["last_update"] = instance.time_update
+            updated = not changes or NewsStats.objects.filter(
+                user_id=instance.user_id
+            ).update(**changes)
+
+    if not updated:
+        refresh_user_stats(instance.user_id)
+    instance._stats_user_id = instance.user_id
+    instance._stats_is_published = instance.__dict__.get("is_published")
+
+
+@receiver(post_delete, sender=News)
+def update_stats_on_delete(sender, instance, **kwargs):
+    # Один UPDATE на строку, без пересчета. last_update пересчитывается
+    # подзапросом, только если удалена самая свежая новость пользователя
+    latest = (
+        News.objects.filter(user_id=OuterRef("user_id"))
+        .order_by()
+        .values("user_id")
+        .annotate(latest=Max("time_update"))
+        .values("latest")
+    )
+    NewsStats.objects.filter(user_id=instance.user_id).update(
+        # Greatest — чтобы рассинхрон не нарушил ограничение >= 0
+        total=Greatest(F("total") - 1, 0),
+        published=Greatest(F("published") - int(instance.is_published), 0),
+        last_update=Case(
+            When(last_update__lte=instance.time_update, then=Subquery(latest)),
+            default=F("last_update"),
+        ),
+    )
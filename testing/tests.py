@@ -1,3 +1,481 @@
-from django.test import TestCase
+import gzip
+import importlib.util
+import random
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .admin import NewsAdminForm
+from .dedup import (
+    NUM_PERM,
+    band_keys,
+    find_duplicate_news,
+    merge_duplicate,
+    minhash,
+    signature_from_bytes,
+    similarity,
+)
+from .middleware import (
+    COMPRESSORS,
+    CompressionMiddleware,
+    choose_encoding,
+    parse_accept_encoding,
+)
+from .models import (
+    NEWS_CONTENT_COMPRESS_THRESHOLD,
+    NEWS_EXCERPT_LENGTH,
+    News,
+    NewsStats,
+    User,
+    make_excerpt,
+)
+from .renderers import ORJSONRenderer
+from .stats import reconcile_news_stats
+
+
+# Индексация в Elasticsearch в тестах не нужна
+@override_settings(ELASTICSEARCH_DSL_AUTOSYNC=False)
+class NewsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="admin", email="admin@example.com", password="password"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class MakeExcerptTests(SimpleTestCase):
+    def test_short_text_is_kept(self):
+        self.assertEqual(make_excerpt("  короткий \n текст "), "короткий текст")
+
+    def test_long_text_is_cut_on_word_boundary(self):
+        excerpt = make_excerpt("слово " * 200)
+        self.assertTrue(excerpt.endswith("слово…"))
+        self.assertLessEqual(len(excerpt), NEWS_EXCERPT_LENGTH + 1)
+
+    def test_single_long_word_is_cut(self):
+        excerpt = make_excerpt("a" * 1000)
+        self.assertEqual(excerpt, "a" * NEWS_EXCERPT_LENGTH + "…")
+
+
+class NewsContentTests(NewsTestCase):
+    big_text = "длинный текст " * 45000
+
+    def test_small_body_is_not_compressed(self):
+        news = News.objects.create(title="t", content="текст", user=self.user)
+        news.refresh_from_db()
+        self.assertEqual(news.content, "текст")
+        self.assertIsNone(news.content_compressed)
+        self.assertEqual(news.excerpt, "текст")
+
+    def test_large_body_round_trip(self):
+        self.assertGreaterEqual(
+            len(self.big_text.encode("utf-8")), NEWS_CONTENT_COMPRESS_THRESHOLD
+        )
+        news = News.objects.create(title="t", content=self.big_text, user=self.user)
+        news.refresh_from_db()
+        self.assertEqual(news.content, "")
+        self.assertIsNotNone(news.content_compressed)
+        self.assertEqual(news.body, self.big_text)
+        self.assertEqual(news.excerpt, make_excerpt(self.big_text))
+
+    def test_content_write_on_compressed_row(self):
+        news = News.objects.create(title="t", content=self.big_text, user=self.user)
+        news.refresh_from_db()
+        news.content = "новый текст"
+        news.save()
+        news.refresh_from_db()
+        self.assertEqual(news.body, "новый текст")
+        self.assertIsNone(news.content_compressed)
+
+    def test_admin_form_edits_compressed_body(self):
+        news = News.objects.create(title="t", content=self.big_text, user=self.user)
+        news.refresh_from_db()
+        form = NewsAdminForm(instance=news)
+        self.assertEqual(form.initial["content"], self.big_text)
+
+        form = NewsAdminForm(
+            {"title": "t", "content": "", "is_published": True, "user": self.user.pk},
+            instance=news,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        news.refresh_from_db()
+        self.assertEqual(news.body, "")
+
+    def test_list_returns_excerpt_and_detail_returns_body(self):
+        news = News.objects.create(title="t", content=self.big_text, user=self.user)
+
+        item = self.client.get("/api/v1/news/").json()["results"][0]
+        self.assertNotIn("content", item)
+        self.assertEqual(item["excerpt"], news.excerpt)
+
+        detail = self.client.get(f"/api/v1/news/{news.pk}/").json()
+        self.assertEqual(detail["content"], self.big_text)
+
+    def test_search_finds_text_past_excerpt(self):
+        # Статьи ниже порога сжатия хранятся как есть и видны SQL-поиску целиком
+        text = "вступление " * 2000 + "редкоеслово"
+        self.assertLess(len(text.encode("utf-8")), NEWS_CONTENT_COMPRESS_THRESHOLD)
+        News.objects.create(title="t", content=text, user=self.user)
+        response = self.client.get("/api/v1/news/?search=редкоеслово")
+        self.assertEqual(response.json()["count"], 1)
+
+    def test_update_through_api(self):
+        news = News.objects.create(title="t", content=self.big_text, user=self.user)
+        response = self.client.patch(
+            f"/api/v1/news/{news.pk}/", {"content": "правка"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        news.refresh_from_db()
+        self.assertEqual(news.body, "правка")
+        self.assertEqual(news.excerpt, "правка")
+
+
+class AcceptEncodingTests(SimpleTestCase):
+    def test_q_after_other_params(self):
+        self.assertEqual(
+            parse_accept_encoding("gzip;level=1;q=0.1, br"),
+            {"gzip": 0.1, "br": 1.0},
+        )
+
+    def test_choose_by_q(self):
+        self.assertEqual(choose_encoding("gzip;q=1, deflate"), "gzip")
+        self.assertIsNone(choose_encoding("gzip;level=1;q=0"))
+        self.assertIsNone(choose_encoding(""))
+        self.assertIsNone(choose_encoding("identity"))
+
+    def test_wildcard(self):
+        self.assertEqual(choose_encoding("*"), next(iter(COMPRESSORS)))
+        self.assertEqual(choose_encoding("*, gzip;q=0.5, zstd;q=0, br;q=0"), "gzip")
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    def get_response(self, content, accept_encoding="gzip"):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+        middleware = CompressionMiddleware(lambda request: HttpResponse(content))
+        return middleware(request)
+
+    def test_gzip(self):
+        content = b"a" * 5000
+        response = self.get_response(content)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), content)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_gzip_has_random_padding(self):
+        lengths = {len(self.get_response(b"a" * 5000).content) for _ in range(20)}
+        self.assertGreater(len(lengths), 1)
+
+    def test_small_response_is_not_compressed(self):
+        response = self.get_response(b"a" * 1000)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, b"a" * 1000)
+
+    @override_settings(RESPONSE_COMPRESSION_MIN_SIZE=100)
+    def test_min_size_setting_is_read_per_request(self):
+        response = self.get_response(b"a" * 500)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_html_is_only_gzipped(self):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="zstd, br, gzip;q=0.5")
+        middleware = CompressionMiddleware(
+            lambda request: HttpResponse(b"<p>form</p>" * 500, content_type="text/html")
+        )
+        self.assertEqual(middleware(request)["Content-Encoding"], "gzip")
+
+    def test_not_accepted(self):
+        response = self.get_response(b"a" * 5000, accept_encoding="gzip;q=0")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def test_same_output_as_json_renderer(self):
+        data = {
+            "text": "строка\u2028",
+            1: Decimal("1.5"),
+            "items": [None, True],
+            "time": datetime(2025, 1, 1, 12, 30, tzinfo=timezone.utc),
+            "date": date(2025, 1, 1),
+            "big": 2 ** 70,
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_non_finite_float_is_rejected(self):
+        data = {"value": float("nan"), "next": None}
+        with self.assertRaises(ValueError):
+            JSONRenderer().render(data)
+        with self.assertRaises(ValueError):
+            ORJSONRenderer().render(data)
+
+    def test_indent_falls_back(self):
+        data = {"a": 1}
+        self.assertEqual(
+            ORJSONRenderer().render(data, "application/json; indent=4"),
+            JSONRenderer().render(data, "application/json; indent=4"),
+        )
+
+
+class NewsStatsTests(NewsTestCase):
+    def get_stats(self, user=None):
+        return NewsStats.objects.values("total", "published").get(
+            user=user or self.user
+        )
+
+    def create_news(self, **kwargs):
+        kwargs.setdefault("user", self.user)
+        return News.objects.create(title="t", content="текст", **kwargs)
+
+    def test_counters_follow_writes(self):
+        first = self.create_news()
+        self.create_news(is_published=False)
+        self.assertEqual(self.get_stats(), {"total": 2, "published": 1})
+
+        first.is_published = False
+        first.save()
+        self.assertEqual(self.get_stats(), {"total": 2, "published": 0})
+
+        first.delete()
+        self.assertEqual(self.get_stats(), {"total": 1, "published": 0})
+
+    def test_last_update_after_deleting_latest(self):
+        older = self.create_news()
+        latest = self.create_news()
+        latest.delete()
+        stats = NewsStats.objects.get(user=self.user)
+        self.assertEqual(stats.last_update, older.time_update)
+
+        older.delete()
+        stats.refresh_from_db()
+        self.assertEqual((stats.total, stats.last_update), (0, None))
+
+    def test_queryset_delete(self):
+        for _ in range(3):
+            self.create_news()
+        News.objects.filter(user=self.user).delete()
+        self.assertEqual(self.get_stats(), {"total": 0, "published": 0})
+
+    def test_owner_change_refreshes_both_users(self):
+        other = User.objects.create_user(
+            username="other", email="other@example.com", password="password"
+        )
+        news = self.create_news()
+        self.create_news(user=other)
+
+        news = News.objects.get(pk=news.pk)
+        news.user = other
+        news.save()
+        self.assertEqual(self.get_stats(), {"total": 0, "published": 0})
+        self.assertEqual(self.get_stats(other), {"total": 2, "published": 2})
+
+    def test_update_does_not_recount(self):
+        news = self.create_news()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.patch(
+                f"/api/v1/news/{news.pk}/", {"title": "новый"}, format="json"
+            )
+            self.client.patch(
+                f"/api/v1/news/{news.pk}/", {"is_published": False}, format="json"
+            )
+        self.assertFalse(any("COUNT" in q["sql"] for q in queries.captured_queries))
+        stats = NewsStats.objects.get(user=self.user)
+        self.assertEqual((stats.total, stats.published), (1, 0))
+        self.assertEqual(stats.last_update, News.objects.get().time_update)
+
+    def test_deferred_status_falls_back_to_refresh(self):
+        self.create_news()
+        news = News.objects.only("id", "user_id").get()
+        news.is_published = False
+        news.save(update_fields=["is_published"])
+        self.assertEqual(self.get_stats(), {"total": 1, "published": 0})
+
+    def test_user_delete_cascades(self):
+        self.create_news()
+        self.user.delete()
+        self.assertFalse(NewsStats.objects.exists())
+
+    def test_reconcile_repairs_drift(self):
+        self.create_news()
+        self.create_news()
+        NewsStats.objects.update(total=10, published=0)
+        self.assertEqual(reconcile_news_stats(), 1)
+        self.assertEqual(self.get_stats(), {"total": 2, "published": 2})
+        self.assertEqual(reconcile_news_stats(), 0)
+
+    def test_stats_endpoint(self):
+        self.create_news()
+        data = self.client.get("/api/v1/news/stats/").json()
+        self.assertEqual((data["user"], data["total"]), (self.user.pk, 1))
+
+        data = self.client.get("/api/v1/news/stats/?user=999").json()
+        self.assertEqual(data["total"], 0)
+
+        response = self.client.get("/api/v1/news/stats/?user=abc")
+        self.assertEqual(response.status_code, 400)
+
+    def test_paginator_uses_counters(self):
+        self.create_news()
+        NewsStats.objects.update(total=42)
+        self.assertEqual(self.client.get("/api/v1/news/").json()["count"], 42)
+        # С поиском счетчики не подходят — обычный COUNT(*)
+        self.assertEqual(
+            self.client.get("/api/v1/news/?search=текст").json()["count"], 1
+        )
+
+
+def make_text(seed, words=200):
+    rng = random.Random(seed)
+    return " ".join(f"слово{rng.randrange(3000)}" for _ in range(words))
+
+
+def edit_text(text, changes=3):
+    words = text.split()
+    for i in range(changes):
+        words[i * 20] = "правка"
+    return " ".join(words)
+
+
+class MinHashTests(SimpleTestCase):
+    def test_short_text_has_no_signature(self):
+        self.assertIsNone(minhash(""))
+        self.assertIsNone(minhash("Фото: пресс-служба РНФ"))
+
+    def test_similarity(self):
+        text = make_text(1)
+        self.assertEqual(similarity(minhash(text), minhash(text)), 1.0)
+        self.assertGreater(similarity(minhash(text), minhash(edit_text(text))), 0.8)
+        self.assertLess(similarity(minhash(text), minhash(make_text(2))), 0.2)
+
+
+    def test_migration_copy_matches(self):
+        migration = importlib.import_module("testing.migrations.0005_news_minhash_lsh")
+        for seed in (1, 2, 3):
+            text = make_text(seed)
+            self.assertEqual(migration.minhash(text), minhash(text))
+            self.assertEqual(migration.band_keys(minhash(text)), band_keys(minhash(text)))
+
+    def test_short_text_signature_is_dense(self):
+        # 10 шинглов на 128 ячеек: пустые ячейки заполнены из непустых
+        signature = minhash(make_text(1)[:120])
+        self.assertEqual(len(signature), NUM_PERM)
+        self.assertLessEqual(len(set(signature)), 20)
+
+
+class NearDuplicateTests(NewsTestCase):
+    def create_news(self, content, title="t"):
+        return News.objects.create(title=title, content=content, user=self.user)
+
+    def test_api_created_news_is_indexed(self):
+        text = make_text(1)
+        response = self.client.post(
+            "/api/v1/news/", {"title": "t", "content": text}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        news = News.objects.get(pk=response.json()["id"])
+        self.assertEqual(news.lsh_buckets.count(), 16)
+        self.assertEqual(find_duplicate_news(minhash(edit_text(text))), news)
+
+    def test_short_news_is_not_indexed(self):
+        news = self.create_news("")
+        self.assertIsNone(news.minhash)
+        self.assertFalse(news.lsh_buckets.exists())
+
+    def test_body_change_rewrites_signature(self):
+        old_text, new_text = make_text(1), make_text(2)
+        news = self.create_news(old_text)
+        self.client.patch(
+            f"/api/v1/news/{news.pk}/", {"content": new_text}, format="json"
+        )
+        news.refresh_from_db()
+        self.assertEqual(
+            signature_from_bytes(news.minhash).tobytes(), minhash(new_text).tobytes()
+        )
+        self.assertIsNone(find_duplicate_news(minhash(old_text)))
+        self.assertEqual(find_duplicate_news(minhash(new_text)), news)
+
+    def test_title_change_keeps_signature(self):
+        news = self.create_news(make_text(1))
+        bucket_ids = set(news.lsh_buckets.values_list("id", flat=True))
+        news = News.objects.get(pk=news.pk)
+        news.title = "другой заголовок"
+        news.save()
+        self.assertEqual(
+            set(news.lsh_buckets.values_list("id", flat=True)), bucket_ids
+        )
+
+    def test_deferred_content_save_keeps_signature(self):
+        news = self.create_news(make_text(1))
+        bucket_ids = set(news.lsh_buckets.values_list("id", flat=True))
+        news = News.objects.for_list().get(pk=news.pk)
+        news.title = "другой заголовок"
+        with CaptureQueriesContext(connection) as queries:
+            news.save()
+        self.assertFalse(
+            any("newslshbucket" in q["sql"] for q in queries.captured_queries)
+        )
+        news.refresh_from_db()
+        self.assertEqual(news.minhash, minhash(make_text(1)).tobytes())
+        self.assertEqual(
+            set(news.lsh_buckets.values_list("id", flat=True)), bucket_ids
+        )
+
+    def test_merge_updates_text_and_time(self):
+        text = make_text(1)
+        news = self.create_news(text)
+        edited = edit_text(text)
+        original = find_duplicate_news(minhash(edited))
+        self.assertTrue(merge_duplicate(original, edited))
+        self.assertFalse(merge_duplicate(original, edited))
+
+        merged = News.objects.get(pk=news.pk)
+        self.assertEqual(merged.body, edited)
+        self.assertGreater(merged.time_update, news.time_update)
+
+    def test_list_does_not_load_signatures(self):
+        self.create_news(make_text(1))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/api/v1/news/")
+        self.assertFalse(
+            any("minhash" in query["sql"] for query in queries.captured_queries)
+        )
+
+    @skipUnless(importlib.util.find_spec("aiohttp"), "aiohttp не установлен")
+    def test_ingest(self):
+        from . import parsing_site
+
+        text = make_text(1)
+        self.create_news(text, title="Исходный релиз")
+        articles = [
+            # Переизданный релиз с новым заголовком сливается с исходным
+            {"title": "Переизданный релиз", "content": edit_text(text)},
+            # Релизы без текста с разными заголовками — не дубликаты
+            {"title": "Фоторепортаж 1", "content": ""},
+            {"title": "Фоторепортаж 2", "content": ""},
+            {"title": "Новый релиз", "content": make_text(2)},
+            {"title": "Копия нового релиза", "content": make_text(2)},
+        ]
+
+        async def parse_articles():
+            return articles
+
+        with mock.patch.object(parsing_site, "parse_articles", parse_articles):
+            parsing_site.CreatingNews()
+
+        self.assertEqual(
+            set(News.objects.values_list("title", flat=True)),
+            {"Исходный релиз", "Фоторепортаж 1", "Фоторепортаж 2", "Новый релиз"},
+        )
+        self.assertEqual(
+            News.objects.get(title="Исходный релиз").body, edit_text(text)
+        )
+        new = News.objects.get(title="Новый релиз")
+        self.assertEqual(new.lsh_buckets.count(), 16)
+        self.assertEqual(NewsStats.objects.get(user=self.user).total, 4)
@@ -1,7 +1,11 @@
 from rest_framework import generics, viewsets, status
 from django.shortcuts import render
-from .models import News
-from .serializers import NewsSerializer
+from functools import partial
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from .models import News, NewsStats
+from .serializers import NewsSerializer, NewsListSerializer, NewsStatsSerializer
+from .stats import total_news_count
 from .documents import NewsDocument
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -9,6 +13,7 @@ from django.forms import model_to_dict
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.pagination import PageNumberPagination
 from rest_framework import filters
+from rest_framework.decorators import action
 from elasticsearch_dsl import Q
 
 class NewsListView(generics.ListCreateAPIView):
@@ -93,11 +98,35 @@ class NewsListView(generics.ListCreateAPIView):
             return Response(serializer.data)
 
 
+class PrecomputedCountPaginator(Paginator):
+    """
+    Paginator, который берет count из переданного значения
+    вместо COUNT(*) по queryset.
+    """
+
+    def __init__(self, *args, count=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._precomputed_count = count
+
+    @cached_property
+    def count(self):
+        if self._precomputed_count is not None:
+            return self._precomputed_count
+        return super().count
+
+
 class NewsAPIListPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 1000
 
+    def paginate_queryset(self, queryset, request, view=None):
+        # View может отдать готовый count из NewsStats (см. get_precomputed_count)
+        get_count = getattr(view, "get_precomputed_count", None)
+        count = get_count(request) if get_count else None
+        self.django_paginator_class = partial(PrecomputedCountPaginator, count=count)
+        return super().paginate_queryset(queryset, request, view)
+
 
 class NewsViewSet(viewsets.ModelViewSet):
     queryset = News.objects.all()
@@ -105,7 +134,41 @@ class NewsViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     pagination_class = NewsAPIListPagination
     filter_backends = [filters.SearchFilter]
-    search_fields = ["title", "content"]
+    # Сжатые тексты (больше NEWS_CONTENT_COMPRESS_THRESHOLD) ищутся здесь только
+    # по title и excerpt, полнотекстовый поиск по ним — через Elasticsearch
+    search_fields = ["title", "excerpt", "content"]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "list":
+            return queryset.for_list()
+        return queryset.select_related("user")
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return NewsListSerializer
+        return super().get_serializer_class()
+
+    def get_precomputed_count(self, request):
+        # Счетчики подходят только для полного списка, без поиска
+        if request.query_params.get(filters.SearchFilter.search_param):
+            return None
+        return total_news_count()
+
+    @action(detail=False, methods=["get"])
+    def stats(self, request):
+        user_id = request.query_params.get("user", request.user.id)
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return Response(
+                {"user": "Некорректный id пользователя."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        stats = NewsStats.objects.filter(user_id=user_id).first()
+        if stats is None:
+            stats = NewsStats(user_id=user_id)
+        return Response(NewsStatsSerializer(stats).data)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)